@@ -1,96 +1,66 @@
 """Capture key frames from the marble simulation."""
 import pygame
 import pymunk
-import pymunk.pygame_util
 import random
-import colorsys
 import os
+import queue
+import threading
+
+from marble_race import (
+    WIDTH, HEIGHT, FPS, MARBLE_COUNT, PHYSICS_DT, GRAVITY, SOLVER_ITERATIONS,
+    BG_COLOR, TEXT_COLOR, MARBLE_SHAPE_TYPES, POLY_UNIT,
+    build_funnel, build_marbles, draw_marbles, get_font, get_marble_states,
+    pymunk_batch, remove_exited_marbles, render_background,
+)
 
 # --- Configuration ---
-WIDTH, HEIGHT = 800, 800
-FPS = 60
-MARBLE_COUNT = 100
-MARBLE_RADIUS = 6
-FUNNEL_WALL_THICKNESS = 5
-
-# Physics Constants
-GRAVITY = 600.0
-ELASTICITY = 1.1
-FRICTION = 0.3
-
-# Colors
-BG_COLOR = (20, 20, 30)
-FUNNEL_COLOR = (200, 200, 200)
-TEXT_COLOR = (255, 255, 255)
+# Nobody watches a capture run by default: render off-screen with SDL's dummy
+# video driver and don't throttle to real time. Set HEADLESS=0 (or false/no)
+# to watch it.
+HEADLESS = os.environ.get("HEADLESS", "1").strip().lower() not in ("0", "false", "no", "off", "")
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+PHYSICS_STEPS_PER_FRAME = round(1 / (FPS * PHYSICS_DT))  # Fixed substeps per frame
 
 # Output directory
 OUTPUT_DIR = "/home/user/crispy-umbrella/frames"
-
-
-def get_rainbow_color(index, total):
-    """Generates a unique color for each marble based on its index."""
-    hue = index / total
-    r, g, b = colorsys.hsv_to_rgb(hue, 0.8, 1.0)
-    return int(r * 255), int(g * 255), int(b * 255)
-
-
-def get_color_name(hue):
-    """Returns a color name based on hue value (0-1)."""
-    color_ranges = [
-        (0.00, "Red"),
-        (0.05, "Orange"),
-        (0.11, "Gold"),
-        (0.16, "Yellow"),
-        (0.22, "Lime"),
-        (0.33, "Green"),
-        (0.44, "Teal"),
-        (0.50, "Cyan"),
-        (0.58, "Sky"),
-        (0.66, "Blue"),
-        (0.75, "Purple"),
-        (0.83, "Magenta"),
-        (0.91, "Pink"),
-        (1.00, "Red"),
-    ]
-    for threshold, name in color_ranges:
-        if hue <= threshold:
-            return name
-    return "Red"
-
-
-SHAPE_NAMES = {
-    0: "Circle",
-    3: "Triangle",
-    4: "Square",
-    5: "Pentagon",
-    6: "Hexagon",
+CAPTURE_QUEUE_SIZE = 8  # Frames buffered for the background writer
+# Image format for saved frames; pygame picks the encoder from the extension.
+# "jpg" encodes roughly 10x faster than "png" when lossless output isn't needed.
+CAPTURE_FORMAT = os.environ.get("CAPTURE_FORMAT", "png")
+
+# Capture milestones at fixed frame counts, keyed by frame for a single lookup.
+# The 50 and 90 marbles finished milestones are checked separately in run().
+FRAME_CAPTURES = {
+    0: 'start',
+    30: 'falling',
+    90: 'funnel_entry',
+    180: 'bouncing',
+    300: 'congestion',
 }
 
 
-def get_polygon_vertices(sides, radius):
-    """Generate vertices for a regular polygon with given number of sides."""
-    import math
-    vertices = []
-    for i in range(sides):
-        angle = (2 * math.pi * i / sides) - math.pi / 2  # Start from top
-        x = radius * math.cos(angle)
-        y = radius * math.sin(angle)
-        vertices.append((x, y))
-    return vertices
-
-
 class MarbleSimulation:
     def __init__(self):
         pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Marble Funnel Simulation")
+        if HEADLESS:
+            # Frames are only saved to disk, so render to a plain surface
+            self.screen = pygame.Surface((WIDTH, HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Marble Funnel Simulation")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 16)
-        self.large_font = pygame.font.SysFont("Arial", 24, bold=True)
+        self.font = get_font(16)
+        self.large_font = get_font(24, bold=True)
+        # Status text surface, re-rendered only when the finished count changes
+        self._status_surf = None
+        self._status_count = None
 
         # Pymunk Setup
         self.space = pymunk.Space()
         self.space.gravity = (0, GRAVITY)
+        self.space.iterations = SOLVER_ITERATIONS
 
         self.marbles = []
         self.finished_rank = []
@@ -100,212 +70,155 @@ class MarbleSimulation:
 
         os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+        # Frames are encoded and written on a background thread so PNG
+        # compression and disk I/O don't stall the physics loop
+        self._capture_queue = queue.Queue(maxsize=CAPTURE_QUEUE_SIZE)
+        # Frame buffers handed to the writer and returned once saved. They are
+        # only allocated when no saved one is free, up to CAPTURE_QUEUE_SIZE
+        self._free_frames = queue.Queue()
+        self._frames_allocated = 0
+        self._capture_error = None  # First save failure, re-raised by flush_captures()
+        self._writer = threading.Thread(target=self._drain_captures, daemon=True)
+        self._writer.start()
+
         self.create_funnel()
+        self._build_background()
         self.spawn_marbles()
+        self._active = list(self.marbles)  # Marbles still in the space
+        # Batch reads report body ids; map them back to marbles
+        self._marble_by_body_id = {m.body.id: m for m in self.marbles} if pymunk_batch else {}
+        self._batch = pymunk_batch and pymunk_batch.Buffer()
+        self._states = []  # (marble, x, y, angle) from the last physics step
 
     def create_funnel(self):
-        """Creates the static lines that form the funnel."""
-        static_body = self.space.static_body
-
-        center_x = WIDTH // 2
-        funnel_top_y = 200
-        funnel_neck_y = 500
-        spout_bottom_y = 700
-        neck_width = 30
-        top_width = 350
-        platform_width = 60  # Small platform at top center
-
-        guard_height = 250  # Height of vertical guards above funnel top
-        walls = [
-            [(-top_width, funnel_top_y), (-neck_width, funnel_neck_y)],
-            [(top_width, funnel_top_y), (neck_width, funnel_neck_y)],
-            [(-neck_width, funnel_neck_y), (-neck_width, spout_bottom_y)],
-            [(neck_width, funnel_neck_y), (neck_width, spout_bottom_y)],
-            # Convex curved platform at top center (marbles roll off sides)
-            [(-platform_width, funnel_top_y + 40), (-platform_width // 2, funnel_top_y + 15)],
-            [(-platform_width // 2, funnel_top_y + 15), (0, funnel_top_y)],
-            [(0, funnel_top_y), (platform_width // 2, funnel_top_y + 15)],
-            [(platform_width // 2, funnel_top_y + 15), (platform_width, funnel_top_y + 40)],
-            # Vertical guards at funnel edges to keep marbles in
-            [(-top_width, funnel_top_y - guard_height), (-top_width, funnel_top_y)],
-            [(top_width, funnel_top_y - guard_height), (top_width, funnel_top_y)],
-        ]
-
-        for p1, p2 in walls:
-            start = (center_x + p1[0], p1[1])
-            end = (center_x + p2[0], p2[1])
-
-            shape = pymunk.Segment(static_body, start, end, FUNNEL_WALL_THICKNESS)
-            shape.elasticity = 0.5
-            shape.friction = 0.5
-            self.space.add(shape)
+        """Creates the static shapes that form the funnel."""
+        self.funnel_segments, self.funnel_platform = build_funnel(self.space)
+
+    def _build_background(self):
+        """Render the background and static funnel once to a reusable surface."""
+        # Share the screen's pixel format so the per-frame blit is a plain copy
+        self._bg = render_background(pygame.Surface((WIDTH, HEIGHT), 0, self.screen),
+                                     self.funnel_segments, self.funnel_platform)
 
     def spawn_marbles(self):
         """Creates 100 marbles in a grid pattern above the center platform."""
         random.seed(42)  # Fixed seed for reproducibility
-        # Spawn centered above the platform (platform is 120px wide at center)
-        start_x = WIDTH // 2 - 70  # Narrower spawn area
-        start_y = 50
-        cols = 10
-        spacing = MARBLE_RADIUS * 2 + 2
-
-        # Shape types: 0=circle, 3=triangle, 4=square, 5=pentagon, 6=hexagon
-        shape_types = [0, 3, 4, 5, 6]
-
-        for i in range(MARBLE_COUNT):
-            row = i // cols
-            col = i % cols
-
-            x = start_x + (col * spacing) + random.uniform(-5, 5)
-            y = start_y + (row * spacing)
-
-            # Randomly vary the radius slightly (80% to 120% of base)
-            radius = MARBLE_RADIUS * random.uniform(0.8, 1.2)
-            shape_type = random.choice(shape_types)
-
-            mass = 1
-            if shape_type == 0:  # Circle
-                moment = pymunk.moment_for_circle(mass, 0, radius)
-                body = pymunk.Body(mass, moment)
-                body.position = (x, y)
-                shape = pymunk.Circle(body, radius)
-            else:  # Polygon
-                vertices = get_polygon_vertices(shape_type, radius)
-                moment = pymunk.moment_for_poly(mass, vertices)
-                body = pymunk.Body(mass, moment)
-                body.position = (x, y)
-                shape = pymunk.Poly(body, vertices)
-
-            shape.elasticity = ELASTICITY
-            shape.friction = FRICTION
-
-            hue = i / MARBLE_COUNT
-            color = get_rainbow_color(i, MARBLE_COUNT)
-            color_name = get_color_name(hue)
-            shape_name = SHAPE_NAMES[shape_type]
-            name = f"{color_name} {shape_name}"
-
-            self.space.add(body, shape)
-
-            self.marbles.append({
-                'body': body,
-                'shape': shape,
-                'color': color,
-                'id': i + 1,
-                'active': True,
-                'shape_type': shape_type,
-                'radius': radius,
-                'name': name
-            })
+        self.marbles = build_marbles(self.space, lambda i: random.choice(MARBLE_SHAPE_TYPES))
 
     def save_frame(self, name):
-        """Save current screen to a file."""
-        filepath = os.path.join(OUTPUT_DIR, f"{name}.png")
-        pygame.image.save(self.screen, filepath)
-        print(f"Saved: {filepath}")
+        """Queue the current screen to be written to a file."""
+        filepath = os.path.join(OUTPUT_DIR, f"{name}.{CAPTURE_FORMAT}")
+        try:
+            frame = self._free_frames.get_nowait()
+        except queue.Empty:
+            if self._frames_allocated < CAPTURE_QUEUE_SIZE:
+                self._frames_allocated += 1
+                self._capture_queue.put((self.screen.copy(), filepath))
+                return
+            frame = self._free_frames.get()  # Wait for the writer to free one
+        frame.blit(self.screen, (0, 0))
+        self._capture_queue.put((frame, filepath))
+
+    def _drain_captures(self):
+        """Writer thread: encode queued frames until the None sentinel arrives."""
+        while True:
+            item = self._capture_queue.get()
+            if item is None:
+                return
+            frame, filepath = item
+            # Keep draining after a failure so save_frame() never waits on a
+            # buffer that won't come back; later frames are dropped
+            if self._capture_error is None:
+                try:
+                    pygame.image.save(frame, filepath)
+                    print(f"Saved: {filepath}")
+                except Exception as e:
+                    self._capture_error = e
+            self._free_frames.put(frame)
+
+    def flush_captures(self):
+        """Block until every queued frame has been written.
+
+        Raises the first error the writer thread hit while saving.
+        """
+        self._capture_queue.put(None)
+        self._writer.join()
+        if self._capture_error is not None:
+            raise self._capture_error
 
     def run(self, max_frames=3000):
-        # Capture milestones
-        capture_points = {
-            'start': 0,
-            'falling': 30,
-            'funnel_entry': 90,
-            'bouncing': 180,
-            'congestion': 300,
-            'midway': None,  # When 50 marbles finish
-            'nearly_done': None,  # When 90 marbles finish
-        }
-
         while self.frame_count < max_frames:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.flush_captures()
                     return
 
-            self.screen.fill(BG_COLOR)
-
             if not self.simulation_over:
                 self.update_physics()
                 self.draw_simulation()
 
                 # Capture at specific frame counts
-                for name, frame in capture_points.items():
-                    if frame == self.frame_count and name not in self.captured_frames:
-                        self.save_frame(f"{self.frame_count:04d}_{name}")
-                        self.captured_frames.add(name)
+                name = FRAME_CAPTURES.get(self.frame_count)
+                if name is not None:
+                    self.save_frame(f"{self.frame_count:04d}_{name}")
+                    self.captured_frames.add(name)
 
                 # Capture at milestone completions
                 finished = len(self.finished_rank)
-                if finished == 50 and 'midway' not in self.captured_frames:
+                if finished >= 50 and 'midway' not in self.captured_frames:
                     self.save_frame(f"{self.frame_count:04d}_midway_50_done")
                     self.captured_frames.add('midway')
-                elif finished == 90 and 'nearly_done' not in self.captured_frames:
+                elif finished >= 90 and 'nearly_done' not in self.captured_frames:
                     self.save_frame(f"{self.frame_count:04d}_nearly_done_90")
                     self.captured_frames.add('nearly_done')
 
             else:
+                self.screen.fill(BG_COLOR)
                 self.draw_results()
                 if 'final' not in self.captured_frames:
                     self.save_frame(f"{self.frame_count:04d}_final_results")
                     self.captured_frames.add('final')
+                    self.flush_captures()
                     print("Simulation complete!")
                     pygame.quit()
                     return
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            if not HEADLESS:
+                pygame.display.flip()
+                self.clock.tick(FPS)
             self.frame_count += 1
 
+        self.flush_captures()
+
     def update_physics(self):
-        dt = 1.0 / FPS
-        self.space.step(dt)
+        # Captures run at a fixed 1x speed, so each frame is a constant
+        # number of PHYSICS_DT steps, matching the interactive race
+        for _ in range(PHYSICS_STEPS_PER_FRAME):
+            self.space.step(PHYSICS_DT)
 
-        for i in range(len(self.marbles) - 1, -1, -1):
-            m = self.marbles[i]
-            if m['active']:
-                if m['body'].position.y > HEIGHT + MARBLE_RADIUS:
-                    m['active'] = False
-                    self.space.remove(m['body'], m['shape'])
-                    self.finished_rank.append(m)
+        states = get_marble_states(self.space, self._active, self._marble_by_body_id, self._batch)
+        exited, self._active, self._states = remove_exited_marbles(self.space, self._active, states)
+        self.finished_rank += exited
 
         if len(self.finished_rank) == MARBLE_COUNT:
             self.simulation_over = True
 
     def draw_simulation(self):
-        # Draw Funnel
-        for shape in self.space.shapes:
-            if isinstance(shape, pymunk.Segment):
-                p1_world = shape.body.local_to_world(shape.a)
-                p2_world = shape.body.local_to_world(shape.b)
-                pygame.draw.line(
-                    self.screen, FUNNEL_COLOR, p1_world, p2_world,
-                    int(shape.radius * 2)
-                )
-
-        # Draw Marbles
-        for m in self.marbles:
-            if m['active']:
-                pos = m['body'].position
-                if m['shape_type'] == 0:  # Circle
-                    pygame.draw.circle(
-                        self.screen, m['color'],
-                        (int(pos.x), int(pos.y)), int(m['radius'])
-                    )
-                    pygame.draw.circle(
-                        self.screen, (0, 0, 0),
-                        (int(pos.x), int(pos.y)), int(m['radius']), 1
-                    )
-                else:  # Polygon
-                    vertices = [m['body'].local_to_world(v) for v in m['shape'].get_vertices()]
-                    points = [(int(v.x), int(v.y)) for v in vertices]
-                    pygame.draw.polygon(self.screen, m['color'], points)
-                    pygame.draw.polygon(self.screen, (0, 0, 0), points, 1)
+        # Background and funnel are static, so blit the cached copy
+        self.screen.blit(self._bg, (0, 0))
 
-        # Draw UI
-        status_text = f"Finished: {len(self.finished_rank)} / {MARBLE_COUNT}"
-        surf = self.font.render(status_text, True, TEXT_COLOR)
-        self.screen.blit(surf, (10, 10))
+        # Draw Marbles as one batch of cached sprites
+        draw_marbles(self.screen, self._states)
 
-        # Frame counter
+        # Draw UI
+        finished = len(self.finished_rank)
+        if finished != self._status_count:
+            status_text = f"Finished: {finished} / {MARBLE_COUNT}"
+            self._status_surf = self.font.render(status_text, True, TEXT_COLOR)
+            self._status_count = finished
+        self.screen.blit(self._status_surf, (10, 10))
+
+        # Frame counter (changes every frame, so it is always rendered)
         frame_text = self.font.render(f"Frame: {self.frame_count}", True, (100, 100, 100))
         self.screen.blit(frame_text, (10, 30))
 
@@ -319,7 +232,7 @@ class MarbleSimulation:
         padding_x = 155
         padding_y = 35
 
-        small_font = pygame.font.SysFont("Arial", 12)
+        small_font = get_font(12)
 
         for i, m in enumerate(self.finished_rank):
             row = i // cols
@@ -329,16 +242,16 @@ class MarbleSimulation:
             y = start_y + row * padding_y
 
             # Draw marble (scaled up for display)
-            display_radius = m['radius'] * 1.2
-            if m['shape_type'] == 0:  # Circle
-                pygame.draw.circle(self.screen, m['color'], (x, y), int(display_radius))
+            display_radius = m.radius * 1.2
+            if m.shape_type == 0:  # Circle
+                pygame.draw.circle(self.screen, m.color, (x, y), int(display_radius))
             else:  # Polygon
-                vertices = get_polygon_vertices(m['shape_type'], display_radius)
-                points = [(int(x + vx), int(y + vy)) for vx, vy in vertices]
-                pygame.draw.polygon(self.screen, m['color'], points)
+                points = [(int(x + ux * display_radius), int(y + uy * display_radius))
+                          for ux, uy in POLY_UNIT[m.shape_type]]
+                pygame.draw.polygon(self.screen, m.color, points)
 
             # Draw Rank and name
-            rank_text = small_font.render(f"#{i+1} {m['name']}", True, (200, 200, 200))
+            rank_text = small_font.render(f"#{i+1} {m.name}", True, (200, 200, 200))
             self.screen.blit(rank_text, (x + 12, y - 6))
 
         # Footer
@@ -4,10 +4,17 @@ import pymunk.pygame_util
 import random
 import colorsys
 import math
+from bisect import bisect_left
+
+try:
+    import pymunk.batch as pymunk_batch
+except ImportError:  # Older pymunk builds have no batch API
+    pymunk_batch = None
 
 # --- Configuration ---
 WIDTH, HEIGHT = 800, 800
 FPS = 60
+IDLE_WAIT_MS = 50  # Longest sleep between frames on the ready/results screens
 MARBLE_COUNT = 100
 MARBLE_RADIUS = 6
 FUNNEL_WALL_THICKNESS = 5
@@ -16,6 +23,12 @@ FUNNEL_WALL_THICKNESS = 5
 GRAVITY = 600.0
 ELASTICITY = 1.1  # Bounciness (values > 1 are super bouncy)
 FRICTION = 0.3
+PHYSICS_DT = 1 / 120  # Largest physics step; faster races take more steps per frame
+SOLVER_ITERATIONS = 5  # Pymunk default is 10; small fixed steps need fewer
+# Marble-vs-marble contacts are most of the solver's work in the crowded neck.
+# False puts every marble in one collision group so they only hit the walls
+# and platforms - much cheaper, but it changes how the race plays out.
+MARBLE_COLLISIONS = True
 
 # Colors
 BG_COLOR = (20, 20, 30)
@@ -31,28 +44,25 @@ def get_rainbow_color(index, total):
     return int(r * 255), int(g * 255), int(b * 255)
 
 
+# Marble colors by index, computed once at import and shared by every marble
+RAINBOW = tuple(get_rainbow_color(i, MARBLE_COUNT) for i in range(MARBLE_COUNT))
+
+
+# Upper hue bound for each color name, sorted so lookups can bisect
+_HUE_THRESHOLDS = (0.00, 0.05, 0.11, 0.16, 0.22, 0.33, 0.44,
+                   0.50, 0.58, 0.66, 0.75, 0.83, 0.91, 1.00)
+_HUE_NAMES = ("Red", "Orange", "Gold", "Yellow", "Lime", "Green", "Teal",
+              "Cyan", "Sky", "Blue", "Purple", "Magenta", "Pink", "Red")
+
+
 def get_color_name(hue):
     """Returns a color name based on hue value (0-1)."""
-    color_ranges = [
-        (0.00, "Red"),
-        (0.05, "Orange"),
-        (0.11, "Gold"),
-        (0.16, "Yellow"),
-        (0.22, "Lime"),
-        (0.33, "Green"),
-        (0.44, "Teal"),
-        (0.50, "Cyan"),
-        (0.58, "Sky"),
-        (0.66, "Blue"),
-        (0.75, "Purple"),
-        (0.83, "Magenta"),
-        (0.91, "Pink"),
-        (1.00, "Red"),
-    ]
-    for threshold, name in color_ranges:
-        if hue <= threshold:
-            return name
-    return "Red"
+    i = bisect_left(_HUE_THRESHOLDS, hue)
+    return _HUE_NAMES[i] if i < len(_HUE_NAMES) else "Red"
+
+
+# Color names by marble index, matching RAINBOW
+COLOR_NAMES = tuple(get_color_name(i / MARBLE_COUNT) for i in range(MARBLE_COUNT))
 
 
 SHAPE_NAMES = {
@@ -62,17 +72,290 @@ SHAPE_NAMES = {
     5: "Pentagon",
     6: "Hexagon",
 }
+MARBLE_SHAPE_TYPES = tuple(SHAPE_NAMES)  # 0=circle, 3=triangle, ... 6=hexagon
+
+
+# Unit-radius vertex tables for each polygon shape, starting from the top
+POLY_UNIT = {
+    sides: [
+        (math.cos(2 * math.pi * i / sides - math.pi / 2),
+         math.sin(2 * math.pi * i / sides - math.pi / 2))
+        for i in range(sides)
+    ]
+    for sides in (3, 4, 5, 6)
+}
+
+# Moment of inertia per unit mass and squared radius for each shape type.
+# A regular n-gon with circumradius r has I = m * r^2 * (1 + 2cos^2(pi/n)) / 6.
+MOMENT_FACTOR = {0: 0.5}
+MOMENT_FACTOR.update({sides: (1 + 2 * math.cos(math.pi / sides) ** 2) / 6
+                      for sides in POLY_UNIT})
 
 
 def get_polygon_vertices(sides, radius):
     """Generate vertices for a regular polygon with given number of sides."""
-    vertices = []
-    for i in range(sides):
-        angle = (2 * math.pi * i / sides) - math.pi / 2  # Start from top
-        x = radius * math.cos(angle)
-        y = radius * math.sin(angle)
-        vertices.append((x, y))
-    return vertices
+    return [(x * radius, y * radius) for x, y in POLY_UNIT[sides]]
+
+
+def transform_vertices(vertices, angle, cx, cy):
+    """Rotate local vertices by angle and translate them to (cx, cy)."""
+    c, s = math.cos(angle), math.sin(angle)
+    return [(cx + x * c - y * s, cy + x * s + y * c) for x, y in vertices]
+
+
+# Body data fetched per frame when pymunk.batch is available
+BATCH_BODY_FIELDS = pymunk_batch and (pymunk_batch.BodyFields.BODY_ID
+                                      | pymunk_batch.BodyFields.POSITION
+                                      | pymunk_batch.BodyFields.ANGLE)
+SPRITE_ANGLE_STEPS = 32  # Rotation buckets for cached polygon sprites
+SPRITE_ANGLE_STEP = 2 * math.pi / SPRITE_ANGLE_STEPS
+
+
+def render_marble_sprite(color, shape_type, radius, angle=0.0):
+    """Render a marble and its outline onto a small transparent surface."""
+    half = int(radius) + 1
+    sprite = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+    if shape_type == 0:  # Circle
+        pygame.draw.circle(sprite, color, (half, half), int(radius))
+        pygame.draw.circle(sprite, (0, 0, 0), (half, half), int(radius), 1)
+    else:  # Polygon, rotated about the sprite centre
+        points = transform_vertices(get_polygon_vertices(shape_type, radius), angle, half, half)
+        pygame.draw.polygon(sprite, color, points)
+        pygame.draw.polygon(sprite, (0, 0, 0), points, 1)
+    if pygame.display.get_surface() is not None:
+        # Match the display's pixel format (headless captures have no display)
+        sprite = sprite.convert_alpha()
+    return sprite
+
+
+# Loaded fonts keyed by (size, bold); SysFont lookups are slow, so share them
+_FONT_CACHE = {}
+
+
+def get_font(size, bold=False):
+    """Return the shared Arial font for a size/weight, loading it on first use."""
+    key = (size, bold)
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        font = pygame.font.SysFont("Arial", size, bold=bold)
+        _FONT_CACHE[key] = font
+    return font
+
+
+def coalesce_motion(events):
+    """Drop MOUSEMOTION events that are immediately followed by another one."""
+    last = len(events) - 1
+    return [event for i, event in enumerate(events)
+            if event.type != pygame.MOUSEMOTION or i == last
+            or events[i + 1].type != pygame.MOUSEMOTION]
+
+
+class Marble:
+    """A single marble: its pymunk objects plus display metadata."""
+    __slots__ = ('body', 'shape', 'color', 'id', 'shape_type', 'radius', 'name',
+                 'tied_for_last', 'sprites', 'sprite_offset')
+
+    def __init__(self, body, shape, color, marble_id, shape_type, radius, name):
+        self.body = body
+        self.shape = shape
+        self.color = color
+        self.id = marble_id
+        self.shape_type = shape_type
+        self.radius = radius
+        self.name = name
+        self.tied_for_last = False
+        # Pre-rendered sprites keyed by rotation bucket (circles only use 0)
+        self.sprites = {0: render_marble_sprite(color, shape_type, radius)}
+        self.sprite_offset = int(radius) + 1
+
+    def get_sprite(self, angle):
+        """Return the cached sprite for the rotation bucket nearest angle."""
+        bucket = 0
+        if self.shape_type != 0:
+            bucket = round(angle / SPRITE_ANGLE_STEP) % SPRITE_ANGLE_STEPS
+        sprite = self.sprites.get(bucket)
+        if sprite is None:
+            sprite = render_marble_sprite(self.color, self.shape_type, self.radius,
+                                          bucket * SPRITE_ANGLE_STEP)
+            self.sprites[bucket] = sprite
+        return sprite
+
+
+def get_marble_states(space, active, marble_by_body_id, buffer):
+    """Return (marble, x, y, angle) for every marble still in the space.
+
+    With pymunk.batch, every body's id, position and angle come back from a
+    single call instead of separate property reads per marble; without it the
+    active list is read body by body.
+    """
+    if pymunk_batch is None:
+        return [(m, *m.body.position, m.body.angle) for m in active]
+    buffer.clear()
+    pymunk_batch.get_space_bodies(space, BATCH_BODY_FIELDS, buffer)
+    ids = memoryview(buffer.int_buf()).cast("P").tolist()
+    values = memoryview(buffer.float_buf()).cast("d").tolist()
+    # The rotating platforms are returned too; keep only bodies that are marbles
+    return [(marble_by_body_id[body_id], x, y, angle)
+            for body_id, x, y, angle in zip(ids, values[0::3], values[1::3], values[2::3])
+            if body_id in marble_by_body_id]
+
+
+def build_funnel(space):
+    """Add the static funnel to space.
+
+    Returns (segments, platform): the wall segments and the top platform.
+    """
+    static_body = space.static_body
+
+    # Funnel coordinates
+    center_x = WIDTH // 2
+    funnel_top_y = 200
+    funnel_neck_y = 500
+    spout_bottom_y = 700
+    neck_width = 30  # Narrow opening
+    top_width = 350
+    platform_width = 60  # Small platform at top center
+
+    # Define line segments
+    guard_height = 250  # Height of vertical guards above funnel top
+    walls = [
+        # Left diagonal wall
+        [(-top_width, funnel_top_y), (-neck_width, funnel_neck_y)],
+        # Right diagonal wall
+        [(top_width, funnel_top_y), (neck_width, funnel_neck_y)],
+        # Left spout wall
+        [(-neck_width, funnel_neck_y), (-neck_width, spout_bottom_y)],
+        # Right spout wall
+        [(neck_width, funnel_neck_y), (neck_width, spout_bottom_y)],
+        # Vertical guards at funnel edges to keep marbles in
+        [(-top_width, funnel_top_y - guard_height), (-top_width, funnel_top_y)],
+        [(top_width, funnel_top_y - guard_height), (top_width, funnel_top_y)],
+    ]
+
+    segments = []
+    for p1, p2 in walls:
+        # Adjust coordinates relative to center_x
+        start = (center_x + p1[0], p1[1])
+        end = (center_x + p2[0], p2[1])
+
+        shape = pymunk.Segment(static_body, start, end, FUNNEL_WALL_THICKNESS)
+        shape.elasticity = 0.5
+        shape.friction = 0.5
+        shape.color = (200, 200, 200, 255)  # RGBA
+        segments.append(shape)
+
+    # Convex curved platform at top center (marbles roll off sides). One
+    # rounded convex polygon gives the same top surface as a chain of
+    # segments with a single shape for the broadphase to track.
+    platform_points = [
+        (center_x - platform_width, funnel_top_y + 40),
+        (center_x - platform_width // 2, funnel_top_y + 15),
+        (center_x, funnel_top_y),
+        (center_x + platform_width // 2, funnel_top_y + 15),
+        (center_x + platform_width, funnel_top_y + 40),
+    ]
+    platform = pymunk.Poly(static_body, platform_points, radius=FUNNEL_WALL_THICKNESS)
+    platform.elasticity = 0.5
+    platform.friction = 0.5
+    space.add(*segments, platform)
+    return segments, platform
+
+
+def render_background(surface, segments, platform):
+    """Fill surface with the background and draw the static funnel onto it."""
+    surface.fill(BG_COLOR)
+    # Funnel segments hang off the static body, so local == world
+    for shape in segments:
+        pygame.draw.line(surface, FUNNEL_COLOR, shape.a, shape.b, int(shape.radius * 2))
+    # The platform's rounded edge is drawn as a thick outline
+    points = platform.get_vertices()
+    pygame.draw.polygon(surface, FUNNEL_COLOR, points)
+    pygame.draw.lines(surface, FUNNEL_COLOR, True, points, int(platform.radius * 2))
+    return surface
+
+
+def build_marbles(space, draw_shape_type):
+    """Add MARBLE_COUNT marbles in a grid above the center platform to space.
+
+    draw_shape_type(i) returns the shape type of marble i. It is called after
+    that marble's jitter and radius are drawn, so a seeded caller drawing
+    from random gets the same sequence every run. Returns the Marble list.
+    """
+    # Spawn centered above the platform (platform is 120px wide at center)
+    start_x = WIDTH // 2 - 70  # Narrower spawn area
+    start_y = 50
+    cols = 10
+    spacing = MARBLE_RADIUS * 2 + 2
+
+    # Shapes sharing a non-zero group never collide with each other
+    marble_filter = pymunk.ShapeFilter(group=1)
+
+    marbles = []
+    new_objects = []
+    for i in range(MARBLE_COUNT):
+        row = i // cols
+        col = i % cols
+
+        x = start_x + (col * spacing) + random.uniform(-5, 5)  # Slight jitter
+        y = start_y + (row * spacing)
+
+        # Randomly vary the radius slightly (80% to 120% of base)
+        radius = MARBLE_RADIUS * random.uniform(0.8, 1.2)
+        shape_type = draw_shape_type(i)
+
+        mass = 1
+        moment = mass * radius * radius * MOMENT_FACTOR[shape_type]
+        body = pymunk.Body(mass, moment)
+        body.position = (x, y)
+        if shape_type == 0:  # Circle
+            shape = pymunk.Circle(body, radius)
+        else:  # Polygon
+            shape = pymunk.Poly(body, get_polygon_vertices(shape_type, radius))
+
+        shape.elasticity = ELASTICITY
+        shape.friction = FRICTION
+        if not MARBLE_COLLISIONS:
+            shape.filter = marble_filter
+
+        color = RAINBOW[i]
+        color_name = COLOR_NAMES[i]
+        shape_name = SHAPE_NAMES[shape_type]
+        name = f"{color_name} {shape_name}"
+
+        new_objects += (body, shape)
+        marbles.append(Marble(body, shape, color, i + 1, shape_type, radius, name))
+
+    space.add(*new_objects)
+    return marbles
+
+
+def remove_exited_marbles(space, active, states):
+    """Remove marbles that fell out of the bottom of the screen from space.
+
+    Returns (exited, still_active, still_states), so the same states can be
+    drawn without reading the bodies again. The lists are only rebuilt on
+    frames where something actually left.
+    """
+    exit_y = HEIGHT + MARBLE_RADIUS
+    exited = [m for m, x, y, angle in states if y > exit_y]
+    if not exited:
+        return exited, active, states
+    space.remove(*[obj for m in exited for obj in (m.body, m.shape)])
+    return (exited, [m for m in active if m not in exited],
+            [state for state in states if state[2] <= exit_y])
+
+
+def draw_marbles(surface, states):
+    """Blit the cached sprite of every on-screen marble in one batched call."""
+    blits = []
+    for m, x, y, angle in states:
+        offset = m.sprite_offset
+        # Skip marbles that have left the screen but not yet been removed
+        if x + offset < 0 or x - offset > WIDTH or y + offset < 0 or y - offset > HEIGHT:
+            continue
+        # blits() truncates float destinations itself; no int() per axis
+        blits.append((m.get_sprite(angle), (x - offset, y - offset)))
+    surface.blits(blits, doreturn=False)
 
 
 class Button:
@@ -82,19 +365,22 @@ class Button:
         self.text = text
         self.color = color
         self.hover_color = hover_color
-        self.font = pygame.font.SysFont("Arial", 18, bold=True)
+        self.font = get_font(18, bold=True)
         self.visible = True
+        self._text_surf = None  # Rendered label, refreshed when text changes
+        self._text_key = None
 
-    def draw(self, screen):
+    def draw(self, screen, mouse_pos):
         if not self.visible:
             return
-        mouse_pos = pygame.mouse.get_pos()
         color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
         pygame.draw.rect(screen, color, self.rect, border_radius=8)
         pygame.draw.rect(screen, (150, 150, 150), self.rect, 2, border_radius=8)
-        text_surf = self.font.render(self.text, True, TEXT_COLOR)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        if self._text_key != self.text:
+            self._text_surf = self.font.render(self.text, True, TEXT_COLOR)
+            self._text_key = self.text
+        text_rect = self._text_surf.get_rect(center=self.rect.center)
+        screen.blit(self._text_surf, text_rect)
 
     def is_clicked(self, event):
         if not self.visible:
@@ -116,10 +402,13 @@ class Slider:
         self.max_val = max_val
         self.value = initial_val
         self.format_str = format_str
-        self.font = pygame.font.SysFont("Arial", 14)
+        self.font = get_font(14)
         self.dragging = False
         self.visible = True
         self.track_rect = pygame.Rect(x, y + 20, width, 8)
+        self.bounds = pygame.Rect(x - 8, y, width + 16, 32)  # Label, track and handle travel
+        self._label_surf = None  # Rendered label, refreshed when the text changes
+        self._label_text = None
         self._update_handle()
 
     def _update_handle(self):
@@ -133,8 +422,10 @@ class Slider:
             return
         # Draw label and value
         label_text = f"{self.label}: {self.format_str.format(self.value)}"
-        label_surf = self.font.render(label_text, True, TEXT_COLOR)
-        screen.blit(label_surf, (self.x, self.y))
+        if label_text != self._label_text:
+            self._label_surf = self.font.render(label_text, True, TEXT_COLOR)
+            self._label_text = label_text
+        screen.blit(self._label_surf, (self.x, self.y))
 
         # Draw track
         pygame.draw.rect(screen, (60, 60, 80), self.track_rect, border_radius=4)
@@ -177,7 +468,13 @@ class MarbleSimulation:
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Marble Funnel Simulation")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 16)
+        self.font = get_font(16)
+        # HUD text surfaces, re-rendered only when their text changes
+        self._status_surf = None
+        self._status_count = None
+        self._timer_surf = None
+        self._timer_key = None
+        self._title_surf = self.font.render("SIMULATION COMPLETE - RANK ORDER", True, TEXT_COLOR)
 
         # Simulation state: "ready", "running", "finished"
         self.state = "ready"
@@ -202,6 +499,18 @@ class MarbleSimulation:
         self.sliders = [self.timer_slider, self.gravity_slider,
                         self.bounce_slider, self.speed_slider]
 
+        # Screen areas the ready-state controls repaint; the rest of that
+        # screen is static until the race starts
+        self._control_rects = [slider.bounds for slider in self.sliders] + [self.start_button.rect]
+
+        # Only queue the events the UI reacts to. Mouse motion is only needed
+        # while a slider is dragged; button hover polls pygame.mouse.get_pos()
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                                  pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE])
+        self._motion_allowed = False
+        self._exposed = False  # Window needs a full repaint after being uncovered
+
         self.setup_simulation()
 
     def setup_simulation(self):
@@ -209,13 +518,22 @@ class MarbleSimulation:
         # Pymunk Setup
         self.space = pymunk.Space()
         self.space.gravity = (0, 0)  # Start with no gravity until simulation begins
+        self.space.iterations = SOLVER_ITERATIONS
 
         self.marbles = []       # List of marble data
         self.finished_rank = []  # List of marble data in order of finish
+        self._ready_bg = None  # Ready-screen scene without its controls
+        self._results_surf = None  # Rendered ranking, built when the race ends
 
         self.create_funnel()
+        self._build_background()
         self.create_rotating_platforms()
         self.spawn_marbles()
+        self._active = list(self.marbles)  # Marbles still in the space
+        # Batch reads report body ids; map them back to marbles
+        self._marble_by_body_id = {m.body.id: m for m in self.marbles} if pymunk_batch else {}
+        self._batch = pymunk_batch and pymunk_batch.Buffer()
+        self._states = None  # (marble, x, y, angle) from the last physics step
 
     def create_rotating_platforms(self):
         """Creates rotating platforms to add chaos to the simulation."""
@@ -241,117 +559,39 @@ class MarbleSimulation:
             shape.elasticity = 0.8
             shape.friction = 0.5
 
-            self.space.add(body, shape)
             self.rotating_bodies.append((body, shape))
 
-    def create_funnel(self):
-        """Creates the static lines that form the funnel."""
-        static_body = self.space.static_body
-
-        # Funnel coordinates
-        center_x = WIDTH // 2
-        funnel_top_y = 200
-        funnel_neck_y = 500
-        spout_bottom_y = 700
-        neck_width = 30  # Narrow opening
-        top_width = 350
-        platform_width = 60  # Small platform at top center
-
-        # Define line segments
-        guard_height = 250  # Height of vertical guards above funnel top
-        walls = [
-            # Left diagonal wall
-            [(-top_width, funnel_top_y), (-neck_width, funnel_neck_y)],
-            # Right diagonal wall
-            [(top_width, funnel_top_y), (neck_width, funnel_neck_y)],
-            # Left spout wall
-            [(-neck_width, funnel_neck_y), (-neck_width, spout_bottom_y)],
-            # Right spout wall
-            [(neck_width, funnel_neck_y), (neck_width, spout_bottom_y)],
-            # Convex curved platform at top center (marbles roll off sides)
-            [(-platform_width, funnel_top_y + 40), (-platform_width // 2, funnel_top_y + 15)],
-            [(-platform_width // 2, funnel_top_y + 15), (0, funnel_top_y)],
-            [(0, funnel_top_y), (platform_width // 2, funnel_top_y + 15)],
-            [(platform_width // 2, funnel_top_y + 15), (platform_width, funnel_top_y + 40)],
-            # Vertical guards at funnel edges to keep marbles in
-            [(-top_width, funnel_top_y - guard_height), (-top_width, funnel_top_y)],
-            [(top_width, funnel_top_y - guard_height), (top_width, funnel_top_y)],
-        ]
+        self.space.add(*[obj for pair in self.rotating_bodies for obj in pair])
 
-        for p1, p2 in walls:
-            # Adjust coordinates relative to center_x
-            start = (center_x + p1[0], p1[1])
-            end = (center_x + p2[0], p2[1])
+    def create_funnel(self):
+        """Creates the static shapes that form the funnel."""
+        self.funnel_segments, self.funnel_platform = build_funnel(self.space)
 
-            shape = pymunk.Segment(static_body, start, end, FUNNEL_WALL_THICKNESS)
-            shape.elasticity = 0.5
-            shape.friction = 0.5
-            shape.color = (200, 200, 200, 255)  # RGBA
-            self.space.add(shape)
+    def _build_background(self):
+        """Render the background and static funnel once to a reusable surface."""
+        self._bg = render_background(pygame.Surface((WIDTH, HEIGHT)).convert(),
+                                     self.funnel_segments, self.funnel_platform)
 
     def spawn_marbles(self):
         """Creates 100 marbles in a grid pattern above the center platform."""
-        # Spawn centered above the platform (platform is 120px wide at center)
-        start_x = WIDTH // 2 - 70  # Narrower spawn area
-        start_y = 50
-        cols = 10
-        spacing = MARBLE_RADIUS * 2 + 2
-
-        # Shape types: 0=circle, 3=triangle, 4=square, 5=pentagon, 6=hexagon
-        shape_types = [0, 3, 4, 5, 6]
-
-        for i in range(MARBLE_COUNT):
-            row = i // cols
-            col = i % cols
-
-            x = start_x + (col * spacing) + random.uniform(-5, 5)  # Slight jitter
-            y = start_y + (row * spacing)
-
-            # Randomly vary the radius slightly (80% to 120% of base)
-            radius = MARBLE_RADIUS * random.uniform(0.8, 1.2)
-            shape_type = random.choice(shape_types)
-
-            mass = 1
-            if shape_type == 0:  # Circle
-                moment = pymunk.moment_for_circle(mass, 0, radius)
-                body = pymunk.Body(mass, moment)
-                body.position = (x, y)
-                shape = pymunk.Circle(body, radius)
-            else:  # Polygon
-                vertices = get_polygon_vertices(shape_type, radius)
-                moment = pymunk.moment_for_poly(mass, vertices)
-                body = pymunk.Body(mass, moment)
-                body.position = (x, y)
-                shape = pymunk.Poly(body, vertices)
-
-            shape.elasticity = ELASTICITY
-            shape.friction = FRICTION
-
-            hue = i / MARBLE_COUNT
-            color = get_rainbow_color(i, MARBLE_COUNT)
-            color_name = get_color_name(hue)
-            shape_name = SHAPE_NAMES[shape_type]
-            name = f"{color_name} {shape_name}"
-
-            self.space.add(body, shape)
-
-            # Store metadata
-            self.marbles.append({
-                'body': body,
-                'shape': shape,
-                'color': color,
-                'id': i + 1,
-                'active': True,
-                'shape_type': shape_type,
-                'radius': radius,
-                'name': name
-            })
+        # Draw every marble's shape in one batched call up front
+        marble_shapes = random.choices(MARBLE_SHAPE_TYPES, k=MARBLE_COUNT)
+        self.marbles = build_marbles(self.space, marble_shapes.__getitem__)
 
     def run(self):
         while True:
-            for event in pygame.event.get():
+            if self.state == "running":
+                events = pygame.event.get()
+            else:
+                # Nothing moves outside a race, so sleep until input arrives
+                # (or the hover refresh timeout) instead of spinning at FPS
+                events = [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get()
+
+            for event in coalesce_motion(events):
                 if event.type == pygame.QUIT:
                     return
+                if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    self._exposed = True
 
                 # Handle slider events in ready state
                 if self.state == "ready":
@@ -364,34 +604,49 @@ class MarbleSimulation:
                 elif self.state == "finished" and self.reset_button.is_clicked(event):
                     self.reset_simulation()
 
-            self.screen.fill(BG_COLOR)
+            self.update_motion_filter()
+            mouse_pos = pygame.mouse.get_pos()  # Polled once per frame for button hover
 
+            dirty = None  # Screen areas to update; None refreshes everything
             if self.state == "ready":
-                self.draw_simulation()
-                # Draw sliders
-                for slider in self.sliders:
-                    slider.draw(self.screen)
-                self.start_button.draw(self.screen)
+                dirty = self.draw_ready(mouse_pos)
             elif self.state == "running":
                 self.update_physics()
                 self.draw_simulation()
             elif self.state == "finished":
-                self.draw_results()
-                self.reset_button.draw(self.screen)
+                dirty = self.draw_results(mouse_pos)
 
-            pygame.display.flip()
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
             self.clock.tick(FPS)
 
+    def update_motion_filter(self):
+        """Let MOUSEMOTION into the event queue only while a slider is dragged."""
+        dragging = any(slider.dragging for slider in self.sliders)
+        if dragging != self._motion_allowed:
+            if dragging:
+                pygame.event.set_allowed(pygame.MOUSEMOTION)
+            else:
+                pygame.event.set_blocked(pygame.MOUSEMOTION)
+            self._motion_allowed = dragging
+
     def start_simulation(self):
         """Start the marble race."""
         self.state = "running"
         # Apply slider settings
         self.space.gravity = (0, self.gravity_slider.value)
         self.sim_speed = self.speed_slider.value
+        # Split each frame's simulated time into equal steps no larger than
+        # PHYSICS_DT; the speed is fixed for the race, so every frame
+        # advances by the same amount
+        self._substeps = max(1, math.ceil(self.sim_speed / FPS / PHYSICS_DT))
+        self._sub_dt = self.sim_speed / FPS / self._substeps
         self.time_limit = self.timer_slider.value
         # Apply bounciness to all marbles
         for m in self.marbles:
-            m['shape'].elasticity = self.bounce_slider.value
+            m.shape.elasticity = self.bounce_slider.value
         self.start_button.visible = False
         self.start_time = pygame.time.get_ticks()
 
@@ -407,35 +662,31 @@ class MarbleSimulation:
         # Get the last place rank
         last_rank = len(self.finished_rank) + 1
 
-        # Add all remaining active marbles as tied for last
-        for m in self.marbles:
-            if m['active']:
-                m['active'] = False
-                m['tied_for_last'] = True
-                # Remove from physics space
-                self.space.remove(m['body'], m['shape'])
-                self.finished_rank.append(m)
+        # Add all remaining active marbles as tied for last, in spawn order
+        leftovers = []
+        for m in self._active:
+            m.tied_for_last = True
+            leftovers += (m.body, m.shape)
+            self.finished_rank.append(m)
+        self._active.clear()
+        self._states = []
+        # Remove them from the physics space in one call
+        self.space.remove(*leftovers)
 
         self.state = "finished"
         self.reset_button.visible = True
 
     def update_physics(self):
-        # Step the physics engine using speed from slider
-        dt = self.sim_speed / FPS
-        self.space.step(dt)
-
-        # Check for marbles exiting the bottom
-        # We iterate backwards to allow safe removal from the list
-        for i in range(len(self.marbles) - 1, -1, -1):
-            m = self.marbles[i]
-            if m['active']:
-                # If marble goes below the screen height (or funnel spout)
-                if m['body'].position.y > HEIGHT + MARBLE_RADIUS:
-                    m['active'] = False
-                    # Remove from physics space
-                    self.space.remove(m['body'], m['shape'])
-                    # Add to rank list
-                    self.finished_rank.append(m)
+        # Step the physics engine the same number of times every frame. High
+        # speeds add steps rather than lengthening them, so they don't turn
+        # into large, tunnelling-prone steps
+        for _ in range(self._substeps):
+            self.space.step(self._sub_dt)
+
+        # Check for marbles exiting the bottom and add them to the rank list
+        states = get_marble_states(self.space, self._active, self._marble_by_body_id, self._batch)
+        exited, self._active, self._states = remove_exited_marbles(self.space, self._active, states)
+        self.finished_rank += exited
 
         # Check elapsed time
         elapsed = (pygame.time.get_ticks() - self.start_time) / 1000.0
@@ -449,47 +700,58 @@ class MarbleSimulation:
             # Time's up - remaining marbles tie for last
             self.end_with_timeout()
 
+    def draw_ready(self, mouse_pos):
+        """Draw the ready screen; returns the changed rects, or None for all of it."""
+        if self._ready_bg is None:
+            # Nothing in the scene moves before the race starts, so render it
+            # once and afterwards only repaint the controls over it
+            self.draw_simulation()
+            self._ready_bg = self.screen.copy()
+            dirty = None
+        else:
+            for rect in self._control_rects:
+                self.screen.blit(self._ready_bg, rect, rect)
+            dirty = self._control_rects
+        # Draw sliders
+        for slider in self.sliders:
+            slider.draw(self.screen)
+        self.start_button.draw(self.screen, mouse_pos)
+        if self._exposed:
+            # The window system may have discarded what was on screen, so
+            # push the whole (still intact) screen surface again
+            self._exposed = False
+            dirty = None
+        return dirty
+
     def draw_simulation(self):
         # Draw Funnel Lines (Pymunk debug draw handles this, but let's make it cleaner)
         # We manually draw marbles to control their colors
 
-        # 1. Draw Funnel (Static shapes)
-        for shape in self.space.shapes:
-            if isinstance(shape, pymunk.Segment):
-                p1 = shape.a
-                p2 = shape.b
-                # Transform local to world if needed (static body usually identity)
-                p1_world = shape.body.local_to_world(p1)
-                p2_world = shape.body.local_to_world(p2)
-                pygame.draw.line(
-                    self.screen, FUNNEL_COLOR, p1_world, p2_world,
-                    int(shape.radius * 2)
-                )
-
-        # 2. Draw Marbles
-        for m in self.marbles:
-            if m['active']:
-                pos = m['body'].position
-                if m['shape_type'] == 0:  # Circle
-                    pygame.draw.circle(
-                        self.screen, m['color'],
-                        (int(pos.x), int(pos.y)), int(m['radius'])
-                    )
-                    pygame.draw.circle(
-                        self.screen, (0, 0, 0),
-                        (int(pos.x), int(pos.y)), int(m['radius']), 1
-                    )
-                else:  # Polygon
-                    # Get world coordinates of vertices
-                    vertices = [m['body'].local_to_world(v) for v in m['shape'].get_vertices()]
-                    points = [(int(v.x), int(v.y)) for v in vertices]
-                    pygame.draw.polygon(self.screen, m['color'], points)
-                    pygame.draw.polygon(self.screen, (0, 0, 0), points, 1)
-
-        # 3. Draw UI
-        status_text = f"Finished: {len(self.finished_rank)} / {MARBLE_COUNT}"
-        surf = self.font.render(status_text, True, TEXT_COLOR)
-        self.screen.blit(surf, (10, 10))
+        # 1. Background and funnel are static, so blit the cached copy
+        self.screen.blit(self._bg, (0, 0))
+
+        # 2. Draw Rotating Platforms
+        for body, shape in self.rotating_bodies:
+            pygame.draw.line(
+                self.screen, FUNNEL_COLOR,
+                body.local_to_world(shape.a), body.local_to_world(shape.b),
+                int(shape.radius * 2)
+            )
+
+        # 3. Draw Marbles as one batch of pre-rendered sprites
+        states = self._states
+        if states is None:  # Ready screen: physics hasn't stepped yet
+            states = get_marble_states(self.space, self._active,
+                                       self._marble_by_body_id, self._batch)
+        draw_marbles(self.screen, states)
+
+        # 4. Draw UI (text is only re-rendered when it changes)
+        finished = len(self.finished_rank)
+        if finished != self._status_count:
+            status_text = f"Finished: {finished} / {MARBLE_COUNT}"
+            self._status_surf = self.font.render(status_text, True, TEXT_COLOR)
+            self._status_count = finished
+        self.screen.blit(self._status_surf, (10, 10))
 
         # Draw timer if simulation is running
         if self.state == "running":
@@ -497,13 +759,37 @@ class MarbleSimulation:
             seconds = int(self.time_remaining % 60)
             timer_color = (255, 100, 100) if self.time_remaining < 10 else TEXT_COLOR
             timer_text = f"Time: {minutes}:{seconds:02d}"
-            timer_surf = self.font.render(timer_text, True, timer_color)
-            self.screen.blit(timer_surf, (WIDTH - 100, 10))
+            if (timer_text, timer_color) != self._timer_key:
+                self._timer_surf = self.font.render(timer_text, True, timer_color)
+                self._timer_key = (timer_text, timer_color)
+            self.screen.blit(self._timer_surf, (WIDTH - 100, 10))
+
+    def draw_results(self, mouse_pos):
+        """Draw the results screen; returns the changed rects, or None for all of it."""
+        if self._results_surf is None:
+            # The ranking is final, so render it once and afterwards only
+            # repaint the Reset button over it
+            self._results_surf = self._render_results()
+            self.screen.blit(self._results_surf, (0, 0))
+            dirty = None
+        else:
+            rect = self.reset_button.rect
+            self.screen.blit(self._results_surf, rect, rect)
+            dirty = [rect]
+        self.reset_button.draw(self.screen, mouse_pos)
+        if self._exposed:
+            self._exposed = False
+            dirty = None
+        return dirty
+
+    def _render_results(self):
+        """Render the ranked results grid onto a new full-screen surface."""
+        surf = pygame.Surface((WIDTH, HEIGHT)).convert()
+        surf.fill(BG_COLOR)
 
-    def draw_results(self):
         # Display the ranked order
-        title = self.font.render("SIMULATION COMPLETE - RANK ORDER", True, TEXT_COLOR)
-        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 20))
+        title = self._title_surf
+        surf.blit(title, (WIDTH // 2 - title.get_width() // 2, 20))
 
         # Grid settings for displaying results
         start_x = 30
@@ -512,7 +798,7 @@ class MarbleSimulation:
         padding_x = 155
         padding_y = 35
 
-        small_font = pygame.font.SysFont("Arial", 12)
+        small_font = get_font(12)
 
         for i, m in enumerate(self.finished_rank):
             row = i // cols
@@ -522,20 +808,21 @@ class MarbleSimulation:
             y = start_y + row * padding_y
 
             # Draw the marble (scaled up for display)
-            display_radius = m['radius'] * 1.2
-            if m['shape_type'] == 0:  # Circle
-                pygame.draw.circle(self.screen, m['color'], (x, y), int(display_radius))
+            display_radius = m.radius * 1.2
+            if m.shape_type == 0:  # Circle
+                pygame.draw.circle(surf, m.color, (x, y), int(display_radius))
             else:  # Polygon
-                vertices = get_polygon_vertices(m['shape_type'], display_radius)
+                vertices = get_polygon_vertices(m.shape_type, display_radius)
                 points = [(int(x + vx), int(y + vy)) for vx, vy in vertices]
-                pygame.draw.polygon(self.screen, m['color'], points)
+                pygame.draw.polygon(surf, m.color, points)
 
             # Draw the Rank # and name
-            if m.get('tied_for_last'):
-                rank_text = small_font.render(f"TIED {m['name']}", True, (255, 100, 100))
+            if m.tied_for_last:
+                rank_text = small_font.render(f"TIED {m.name}", True, (255, 100, 100))
             else:
-                rank_text = small_font.render(f"#{i+1} {m['name']}", True, (200, 200, 200))
-            self.screen.blit(rank_text, (x + 12, y - 6))
+                rank_text = small_font.render(f"#{i+1} {m.name}", True, (200, 200, 200))
+            surf.blit(rank_text, (x + 12, y - 6))
+        return surf
 
 
 if __name__ == "__main__":
@@ -8,6 +8,12 @@ import random
 import colorsys
 import math
 import asyncio
+from bisect import bisect_left
+
+try:
+    import pymunk.batch as pymunk_batch
+except ImportError:  # Older pymunk builds have no batch API
+    pymunk_batch = None
 
 # --- Configuration ---
 WIDTH, HEIGHT = 800, 800
@@ -20,6 +26,9 @@ FUNNEL_WALL_THICKNESS = 5
 GRAVITY = 600.0
 ELASTICITY = 1.1
 FRICTION = 0.3
+PHYSICS_DT = 1 / 120  # Largest physics step; faster races take more steps per frame
+SOLVER_ITERATIONS = 5
+MARBLE_COLLISIONS = True  # False: marbles pass through each other (cheaper, different race)
 
 # Colors
 BG_COLOR = (20, 20, 30)
@@ -34,32 +43,256 @@ def get_rainbow_color(index, total):
     return int(r * 255), int(g * 255), int(b * 255)
 
 
+RAINBOW = tuple(get_rainbow_color(i, MARBLE_COUNT) for i in range(MARBLE_COUNT))
+
+
+_HUE_THRESHOLDS = (0.00, 0.05, 0.11, 0.16, 0.22, 0.33, 0.44,
+                   0.50, 0.58, 0.66, 0.75, 0.83, 0.91, 1.00)
+_HUE_NAMES = ("Red", "Orange", "Gold", "Yellow", "Lime", "Green", "Teal",
+              "Cyan", "Sky", "Blue", "Purple", "Magenta", "Pink", "Red")
+
+
 def get_color_name(hue):
     """Returns a color name based on hue value (0-1)."""
-    color_ranges = [
-        (0.00, "Red"), (0.05, "Orange"), (0.11, "Gold"), (0.16, "Yellow"),
-        (0.22, "Lime"), (0.33, "Green"), (0.44, "Teal"), (0.50, "Cyan"),
-        (0.58, "Sky"), (0.66, "Blue"), (0.75, "Purple"), (0.83, "Magenta"),
-        (0.91, "Pink"), (1.00, "Red"),
-    ]
-    for threshold, name in color_ranges:
-        if hue <= threshold:
-            return name
-    return "Red"
+    i = bisect_left(_HUE_THRESHOLDS, hue)
+    return _HUE_NAMES[i] if i < len(_HUE_NAMES) else "Red"
+
+
+COLOR_NAMES = tuple(get_color_name(i / MARBLE_COUNT) for i in range(MARBLE_COUNT))
 
 
 SHAPE_NAMES = {0: "Circle", 3: "Triangle", 4: "Square", 5: "Pentagon", 6: "Hexagon"}
+MARBLE_SHAPE_TYPES = tuple(SHAPE_NAMES)
+
+
+POLY_UNIT = {
+    sides: [(math.cos(2 * math.pi * i / sides - math.pi / 2),
+             math.sin(2 * math.pi * i / sides - math.pi / 2)) for i in range(sides)]
+    for sides in (3, 4, 5, 6)
+}
+# Moment of inertia per unit mass and squared radius: I = m * r^2 * factor
+MOMENT_FACTOR = {0: 0.5}
+MOMENT_FACTOR.update({sides: (1 + 2 * math.cos(math.pi / sides) ** 2) / 6
+                      for sides in POLY_UNIT})
 
 
 def get_polygon_vertices(sides, radius):
     """Generate vertices for a regular polygon with given number of sides."""
-    vertices = []
-    for i in range(sides):
-        angle = (2 * math.pi * i / sides) - math.pi / 2
-        x = radius * math.cos(angle)
-        y = radius * math.sin(angle)
-        vertices.append((x, y))
-    return vertices
+    return [(x * radius, y * radius) for x, y in POLY_UNIT[sides]]
+
+
+def transform_vertices(vertices, angle, cx, cy):
+    """Rotate local vertices by angle and translate them to (cx, cy)."""
+    c, s = math.cos(angle), math.sin(angle)
+    return [(cx + x * c - y * s, cy + x * s + y * c) for x, y in vertices]
+
+
+# Body data fetched per frame when pymunk.batch is available
+BATCH_BODY_FIELDS = pymunk_batch and (pymunk_batch.BodyFields.BODY_ID
+                                      | pymunk_batch.BodyFields.POSITION
+                                      | pymunk_batch.BodyFields.ANGLE)
+SPRITE_ANGLE_STEPS = 32  # Rotation buckets for cached polygon sprites
+SPRITE_ANGLE_STEP = 2 * math.pi / SPRITE_ANGLE_STEPS
+
+
+def render_marble_sprite(color, shape_type, radius, angle=0.0):
+    """Render a marble and its outline onto a small transparent surface."""
+    half = int(radius) + 1
+    sprite = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+    if shape_type == 0:  # Circle
+        pygame.draw.circle(sprite, color, (half, half), int(radius))
+        pygame.draw.circle(sprite, (0, 0, 0), (half, half), int(radius), 1)
+    else:  # Polygon, rotated about the sprite centre
+        points = transform_vertices(get_polygon_vertices(shape_type, radius), angle, half, half)
+        pygame.draw.polygon(sprite, color, points)
+        pygame.draw.polygon(sprite, (0, 0, 0), points, 1)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+    return sprite
+
+
+_FONT_CACHE = {}
+
+
+def get_font(size, bold=False):
+    """Return the shared Arial font for a size/weight, loading it on first use."""
+    key = (size, bold)
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        font = pygame.font.SysFont("Arial", size, bold=bold)
+        _FONT_CACHE[key] = font
+    return font
+
+
+def coalesce_motion(events):
+    """Drop MOUSEMOTION events that are immediately followed by another one."""
+    last = len(events) - 1
+    return [event for i, event in enumerate(events)
+            if event.type != pygame.MOUSEMOTION or i == last
+            or events[i + 1].type != pygame.MOUSEMOTION]
+
+
+class Marble:
+    """A single marble: its pymunk objects plus display metadata."""
+    __slots__ = ('body', 'shape', 'color', 'id', 'shape_type', 'radius', 'name',
+                 'tied_for_last', 'sprites', 'sprite_offset')
+
+    def __init__(self, body, shape, color, marble_id, shape_type, radius, name):
+        self.body = body
+        self.shape = shape
+        self.color = color
+        self.id = marble_id
+        self.shape_type = shape_type
+        self.radius = radius
+        self.name = name
+        self.tied_for_last = False
+        # Pre-rendered sprites keyed by rotation bucket (circles only use 0)
+        self.sprites = {0: render_marble_sprite(color, shape_type, radius)}
+        self.sprite_offset = int(radius) + 1
+
+    def get_sprite(self, angle):
+        """Return the cached sprite for the rotation bucket nearest angle."""
+        bucket = 0
+        if self.shape_type != 0:
+            bucket = round(angle / SPRITE_ANGLE_STEP) % SPRITE_ANGLE_STEPS
+        sprite = self.sprites.get(bucket)
+        if sprite is None:
+            sprite = render_marble_sprite(self.color, self.shape_type, self.radius,
+                                          bucket * SPRITE_ANGLE_STEP)
+            self.sprites[bucket] = sprite
+        return sprite
+
+
+def get_marble_states(space, active, marble_by_body_id, buffer):
+    """Return (marble, x, y, angle) for every marble still in the space."""
+    if pymunk_batch is None:
+        return [(m, *m.body.position, m.body.angle) for m in active]
+    buffer.clear()
+    pymunk_batch.get_space_bodies(space, BATCH_BODY_FIELDS, buffer)
+    ids = memoryview(buffer.int_buf()).cast("P").tolist()
+    values = memoryview(buffer.float_buf()).cast("d").tolist()
+    return [(marble_by_body_id[body_id], x, y, angle)
+            for body_id, x, y, angle in zip(ids, values[0::3], values[1::3], values[2::3])
+            if body_id in marble_by_body_id]
+
+
+def build_funnel(space):
+    static_body = space.static_body
+    center_x = WIDTH // 2
+    funnel_top_y = 200
+    funnel_neck_y = 500
+    spout_bottom_y = 700
+    neck_width = 30
+    top_width = 350
+    platform_width = 60
+    guard_height = 250
+
+    walls = [
+        [(-top_width, funnel_top_y), (-neck_width, funnel_neck_y)],
+        [(top_width, funnel_top_y), (neck_width, funnel_neck_y)],
+        [(-neck_width, funnel_neck_y), (-neck_width, spout_bottom_y)],
+        [(neck_width, funnel_neck_y), (neck_width, spout_bottom_y)],
+        [(-top_width, funnel_top_y - guard_height), (-top_width, funnel_top_y)],
+        [(top_width, funnel_top_y - guard_height), (top_width, funnel_top_y)],
+    ]
+
+    segments = []
+    for p1, p2 in walls:
+        start = (center_x + p1[0], p1[1])
+        end = (center_x + p2[0], p2[1])
+        shape = pymunk.Segment(static_body, start, end, FUNNEL_WALL_THICKNESS)
+        shape.elasticity = 0.5
+        shape.friction = 0.5
+        segments.append(shape)
+
+    platform_points = [
+        (center_x - platform_width, funnel_top_y + 40),
+        (center_x - platform_width // 2, funnel_top_y + 15),
+        (center_x, funnel_top_y),
+        (center_x + platform_width // 2, funnel_top_y + 15),
+        (center_x + platform_width, funnel_top_y + 40),
+    ]
+    platform = pymunk.Poly(static_body, platform_points, radius=FUNNEL_WALL_THICKNESS)
+    platform.elasticity = 0.5
+    platform.friction = 0.5
+    space.add(*segments, platform)
+    return segments, platform
+
+
+def render_background(surface, segments, platform):
+    surface.fill(BG_COLOR)
+    for shape in segments:
+        pygame.draw.line(surface, FUNNEL_COLOR, shape.a, shape.b, int(shape.radius * 2))
+    points = platform.get_vertices()
+    pygame.draw.polygon(surface, FUNNEL_COLOR, points)
+    pygame.draw.lines(surface, FUNNEL_COLOR, True, points, int(platform.radius * 2))
+    return surface
+
+
+def build_marbles(space, draw_shape_type):
+    """Add the marble grid to space; draw_shape_type(i) picks marble i's shape."""
+    start_x = WIDTH // 2 - 70
+    start_y = 50
+    cols = 10
+    spacing = MARBLE_RADIUS * 2 + 2
+
+    # Shapes sharing a non-zero group never collide with each other
+    marble_filter = pymunk.ShapeFilter(group=1)
+
+    marbles = []
+    new_objects = []
+    for i in range(MARBLE_COUNT):
+        row = i // cols
+        col = i % cols
+        x = start_x + (col * spacing) + random.uniform(-5, 5)
+        y = start_y + (row * spacing)
+        radius = MARBLE_RADIUS * random.uniform(0.8, 1.2)
+        shape_type = draw_shape_type(i)
+
+        mass = 1
+        body = pymunk.Body(mass, mass * radius * radius * MOMENT_FACTOR[shape_type])
+        body.position = (x, y)
+        if shape_type == 0:
+            shape = pymunk.Circle(body, radius)
+        else:
+            shape = pymunk.Poly(body, get_polygon_vertices(shape_type, radius))
+
+        shape.elasticity = ELASTICITY
+        shape.friction = FRICTION
+        if not MARBLE_COLLISIONS:
+            shape.filter = marble_filter
+
+        color = RAINBOW[i]
+        color_name = COLOR_NAMES[i]
+        shape_name = SHAPE_NAMES[shape_type]
+        name = f"{color_name} {shape_name}"
+
+        new_objects += (body, shape)
+        marbles.append(Marble(body, shape, color, i + 1, shape_type, radius, name))
+
+    space.add(*new_objects)
+    return marbles
+
+
+def remove_exited_marbles(space, active, states):
+    """Remove marbles below the screen; returns (exited, still_active, still_states)."""
+    exit_y = HEIGHT + MARBLE_RADIUS
+    exited = [m for m, x, y, angle in states if y > exit_y]
+    if not exited:
+        return exited, active, states
+    space.remove(*[obj for m in exited for obj in (m.body, m.shape)])
+    return (exited, [m for m in active if m not in exited],
+            [state for state in states if state[2] <= exit_y])
+
+
+def draw_marbles(surface, states):
+    blits = []
+    for m, x, y, angle in states:
+        offset = m.sprite_offset
+        if x + offset < 0 or x - offset > WIDTH or y + offset < 0 or y - offset > HEIGHT:
+            continue
+        blits.append((m.get_sprite(angle), (x - offset, y - offset)))
+    surface.blits(blits, doreturn=False)
 
 
 class Button:
@@ -69,19 +302,22 @@ class Button:
         self.text = text
         self.color = color
         self.hover_color = hover_color
-        self.font = pygame.font.SysFont("Arial", 18, bold=True)
+        self.font = get_font(18, bold=True)
         self.visible = True
+        self._text_surf = None  # Rendered label, refreshed when text changes
+        self._text_key = None
 
-    def draw(self, screen):
+    def draw(self, screen, mouse_pos):
         if not self.visible:
             return
-        mouse_pos = pygame.mouse.get_pos()
         color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
         pygame.draw.rect(screen, color, self.rect, border_radius=8)
         pygame.draw.rect(screen, (150, 150, 150), self.rect, 2, border_radius=8)
-        text_surf = self.font.render(self.text, True, TEXT_COLOR)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        if self._text_key != self.text:
+            self._text_surf = self.font.render(self.text, True, TEXT_COLOR)
+            self._text_key = self.text
+        text_rect = self._text_surf.get_rect(center=self.rect.center)
+        screen.blit(self._text_surf, text_rect)
 
     def is_clicked(self, event):
         if not self.visible:
@@ -103,10 +339,13 @@ class Slider:
         self.max_val = max_val
         self.value = initial_val
         self.format_str = format_str
-        self.font = pygame.font.SysFont("Arial", 14)
+        self.font = get_font(14)
         self.dragging = False
         self.visible = True
         self.track_rect = pygame.Rect(x, y + 20, width, 8)
+        self.bounds = pygame.Rect(x - 8, y, width + 16, 32)  # Label, track and handle travel
+        self._label_surf = None  # Rendered label, refreshed when the text changes
+        self._label_text = None
         self._update_handle()
 
     def _update_handle(self):
@@ -118,8 +357,10 @@ class Slider:
         if not self.visible:
             return
         label_text = f"{self.label}: {self.format_str.format(self.value)}"
-        label_surf = self.font.render(label_text, True, TEXT_COLOR)
-        screen.blit(label_surf, (self.x, self.y))
+        if label_text != self._label_text:
+            self._label_surf = self.font.render(label_text, True, TEXT_COLOR)
+            self._label_text = label_text
+        screen.blit(self._label_surf, (self.x, self.y))
         pygame.draw.rect(screen, (60, 60, 80), self.track_rect, border_radius=4)
         ratio = (self.value - self.min_val) / (self.max_val - self.min_val)
         filled_width = int(ratio * self.width)
@@ -155,7 +396,13 @@ class MarbleSimulation:
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Marble Funnel Simulation")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 16)
+        self.font = get_font(16)
+        # HUD text surfaces, re-rendered only when their text changes
+        self._status_surf = None
+        self._status_count = None
+        self._timer_surf = None
+        self._timer_key = None
+        self._title_surf = self.font.render("SIMULATION COMPLETE - RANK ORDER", True, TEXT_COLOR)
 
         self.state = "ready"
 
@@ -176,17 +423,34 @@ class MarbleSimulation:
 
         self.sliders = [self.timer_slider, self.gravity_slider,
                         self.bounce_slider, self.speed_slider]
+        self._control_rects = [slider.bounds for slider in self.sliders] + [self.start_button.rect]
+
+        # Only queue the events the UI reacts to; MOUSEMOTION is only let
+        # through while a slider is being dragged
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                                  pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE])
+        self._motion_allowed = False
+        self._exposed = False  # Window needs a full repaint after being uncovered
 
         self.setup_simulation()
 
     def setup_simulation(self):
         self.space = pymunk.Space()
         self.space.gravity = (0, 0)
+        self.space.iterations = SOLVER_ITERATIONS
         self.marbles = []
         self.finished_rank = []
+        self._ready_bg = None  # Ready-screen scene without its controls
+        self._results_surf = None  # Rendered ranking, built when the race ends
         self.create_funnel()
+        self._build_background()
         self.create_rotating_platforms()
         self.spawn_marbles()
+        self._active = list(self.marbles)
+        self._marble_by_body_id = {m.body.id: m for m in self.marbles} if pymunk_batch else {}
+        self._batch = pymunk_batch and pymunk_batch.Buffer()
+        self._states = None
 
     def create_rotating_platforms(self):
         center_x = WIDTH // 2
@@ -203,128 +467,41 @@ class MarbleSimulation:
             shape = pymunk.Segment(body, (-length, 0), (length, 0), 4)
             shape.elasticity = 0.8
             shape.friction = 0.5
-            self.space.add(body, shape)
             self.rotating_bodies.append((body, shape))
 
+        self.space.add(*[obj for pair in self.rotating_bodies for obj in pair])
+
     def create_funnel(self):
-        static_body = self.space.static_body
-        center_x = WIDTH // 2
-        funnel_top_y = 200
-        funnel_neck_y = 500
-        spout_bottom_y = 700
-        neck_width = 30
-        top_width = 350
-        platform_width = 60
-        guard_height = 250
-
-        walls = [
-            [(-top_width, funnel_top_y), (-neck_width, funnel_neck_y)],
-            [(top_width, funnel_top_y), (neck_width, funnel_neck_y)],
-            [(-neck_width, funnel_neck_y), (-neck_width, spout_bottom_y)],
-            [(neck_width, funnel_neck_y), (neck_width, spout_bottom_y)],
-            [(-platform_width, funnel_top_y + 40), (-platform_width // 2, funnel_top_y + 15)],
-            [(-platform_width // 2, funnel_top_y + 15), (0, funnel_top_y)],
-            [(0, funnel_top_y), (platform_width // 2, funnel_top_y + 15)],
-            [(platform_width // 2, funnel_top_y + 15), (platform_width, funnel_top_y + 40)],
-            [(-top_width, funnel_top_y - guard_height), (-top_width, funnel_top_y)],
-            [(top_width, funnel_top_y - guard_height), (top_width, funnel_top_y)],
-        ]
+        self.funnel_segments, self.funnel_platform = build_funnel(self.space)
 
-        for p1, p2 in walls:
-            start = (center_x + p1[0], p1[1])
-            end = (center_x + p2[0], p2[1])
-            shape = pymunk.Segment(static_body, start, end, FUNNEL_WALL_THICKNESS)
-            shape.elasticity = 0.5
-            shape.friction = 0.5
-            self.space.add(shape)
+    def _build_background(self):
+        """Render the background and static funnel once to a reusable surface."""
+        self._bg = render_background(pygame.Surface((WIDTH, HEIGHT)).convert(),
+                                     self.funnel_segments, self.funnel_platform)
 
     def spawn_marbles(self):
-        start_x = WIDTH // 2 - 70
-        start_y = 50
-        cols = 10
-        spacing = MARBLE_RADIUS * 2 + 2
-        shape_types = [0, 3, 4, 5, 6]
-
-        for i in range(MARBLE_COUNT):
-            row = i // cols
-            col = i % cols
-            x = start_x + (col * spacing) + random.uniform(-5, 5)
-            y = start_y + (row * spacing)
-            radius = MARBLE_RADIUS * random.uniform(0.8, 1.2)
-            shape_type = random.choice(shape_types)
-
-            mass = 1
-            if shape_type == 0:
-                moment = pymunk.moment_for_circle(mass, 0, radius)
-                body = pymunk.Body(mass, moment)
-                body.position = (x, y)
-                shape = pymunk.Circle(body, radius)
+        # Draw every marble's shape in one batched call up front
+        marble_shapes = random.choices(MARBLE_SHAPE_TYPES, k=MARBLE_COUNT)
+        self.marbles = build_marbles(self.space, marble_shapes.__getitem__)
+
+    def update_motion_filter(self):
+        dragging = any(slider.dragging for slider in self.sliders)
+        if dragging != self._motion_allowed:
+            if dragging:
+                pygame.event.set_allowed(pygame.MOUSEMOTION)
             else:
-                vertices = get_polygon_vertices(shape_type, radius)
-                moment = pymunk.moment_for_poly(mass, vertices)
-                body = pymunk.Body(mass, moment)
-                body.position = (x, y)
-                shape = pymunk.Poly(body, vertices)
-
-            shape.elasticity = ELASTICITY
-            shape.friction = FRICTION
-
-            hue = i / MARBLE_COUNT
-            color = get_rainbow_color(i, MARBLE_COUNT)
-            color_name = get_color_name(hue)
-            shape_name = SHAPE_NAMES[shape_type]
-            name = f"{color_name} {shape_name}"
-
-            self.space.add(body, shape)
-            self.marbles.append({
-                'body': body, 'shape': shape, 'color': color, 'id': i + 1,
-                'active': True, 'shape_type': shape_type, 'radius': radius, 'name': name
-            })
-
-    async def run(self):
-        """Main game loop - async for Pygbag compatibility."""
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-
-                if self.state == "ready":
-                    for slider in self.sliders:
-                        slider.handle_event(event)
-
-                if self.state == "ready" and self.start_button.is_clicked(event):
-                    self.start_simulation()
-                elif self.state == "finished" and self.reset_button.is_clicked(event):
-                    self.reset_simulation()
-
-            self.screen.fill(BG_COLOR)
-
-            if self.state == "ready":
-                self.draw_simulation()
-                for slider in self.sliders:
-                    slider.draw(self.screen)
-                self.start_button.draw(self.screen)
-            elif self.state == "running":
-                self.update_physics()
-                self.draw_simulation()
-            elif self.state == "finished":
-                self.draw_results()
-                self.reset_button.draw(self.screen)
-
-            pygame.display.flip()
-            self.clock.tick(FPS)
-            await asyncio.sleep(0)  # Required for Pygbag
-
-        pygame.quit()
+                pygame.event.set_blocked(pygame.MOUSEMOTION)
+            self._motion_allowed = dragging
 
     def start_simulation(self):
         self.state = "running"
         self.space.gravity = (0, self.gravity_slider.value)
         self.sim_speed = self.speed_slider.value
+        self._substeps = max(1, math.ceil(self.sim_speed / FPS / PHYSICS_DT))
+        self._sub_dt = self.sim_speed / FPS / self._substeps
         self.time_limit = self.timer_slider.value
         for m in self.marbles:
-            m['shape'].elasticity = self.bounce_slider.value
+            m.shape.elasticity = self.bounce_slider.value
         self.start_button.visible = False
         self.start_time = pygame.time.get_ticks()
 
@@ -335,26 +512,24 @@ class MarbleSimulation:
         self.setup_simulation()
 
     def end_with_timeout(self):
-        for m in self.marbles:
-            if m['active']:
-                m['active'] = False
-                m['tied_for_last'] = True
-                self.space.remove(m['body'], m['shape'])
-                self.finished_rank.append(m)
+        leftovers = []
+        for m in self._active:
+            m.tied_for_last = True
+            leftovers += (m.body, m.shape)
+            self.finished_rank.append(m)
+        self._active.clear()
+        self._states = []
+        self.space.remove(*leftovers)
         self.state = "finished"
         self.reset_button.visible = True
 
     def update_physics(self):
-        dt = self.sim_speed / FPS
-        self.space.step(dt)
+        for _ in range(self._substeps):
+            self.space.step(self._sub_dt)
 
-        for i in range(len(self.marbles) - 1, -1, -1):
-            m = self.marbles[i]
-            if m['active']:
-                if m['body'].position.y > HEIGHT + MARBLE_RADIUS:
-                    m['active'] = False
-                    self.space.remove(m['body'], m['shape'])
-                    self.finished_rank.append(m)
+        states = get_marble_states(self.space, self._active, self._marble_by_body_id, self._batch)
+        exited, self._active, self._states = remove_exited_marbles(self.space, self._active, states)
+        self.finished_rank += exited
 
         elapsed = (pygame.time.get_ticks() - self.start_time) / 1000.0
         self.time_remaining = max(0, self.time_limit - elapsed)
@@ -365,50 +540,80 @@ class MarbleSimulation:
         elif self.time_remaining <= 0:
             self.end_with_timeout()
 
+    def draw_ready(self, mouse_pos):
+        if self._ready_bg is None:
+            self.draw_simulation()
+            self._ready_bg = self.screen.copy()
+            dirty = None
+        else:
+            for rect in self._control_rects:
+                self.screen.blit(self._ready_bg, rect, rect)
+            dirty = self._control_rects
+        for slider in self.sliders:
+            slider.draw(self.screen)
+        self.start_button.draw(self.screen, mouse_pos)
+        if self._exposed:
+            self._exposed = False
+            dirty = None
+        return dirty
+
     def draw_simulation(self):
-        for shape in self.space.shapes:
-            if isinstance(shape, pymunk.Segment):
-                p1_world = shape.body.local_to_world(shape.a)
-                p2_world = shape.body.local_to_world(shape.b)
-                pygame.draw.line(self.screen, FUNNEL_COLOR, p1_world, p2_world,
-                                 int(shape.radius * 2))
+        self.screen.blit(self._bg, (0, 0))
 
-        for m in self.marbles:
-            if m['active']:
-                pos = m['body'].position
-                if m['shape_type'] == 0:
-                    pygame.draw.circle(self.screen, m['color'],
-                                       (int(pos.x), int(pos.y)), int(m['radius']))
-                    pygame.draw.circle(self.screen, (0, 0, 0),
-                                       (int(pos.x), int(pos.y)), int(m['radius']), 1)
-                else:
-                    vertices = [m['body'].local_to_world(v) for v in m['shape'].get_vertices()]
-                    points = [(int(v.x), int(v.y)) for v in vertices]
-                    pygame.draw.polygon(self.screen, m['color'], points)
-                    pygame.draw.polygon(self.screen, (0, 0, 0), points, 1)
-
-        status_text = f"Finished: {len(self.finished_rank)} / {MARBLE_COUNT}"
-        surf = self.font.render(status_text, True, TEXT_COLOR)
-        self.screen.blit(surf, (10, 10))
+        for body, shape in self.rotating_bodies:
+            pygame.draw.line(self.screen, FUNNEL_COLOR, body.local_to_world(shape.a),
+                             body.local_to_world(shape.b), int(shape.radius * 2))
+
+        states = self._states
+        if states is None:
+            states = get_marble_states(self.space, self._active,
+                                       self._marble_by_body_id, self._batch)
+        draw_marbles(self.screen, states)
+
+        finished = len(self.finished_rank)
+        if finished != self._status_count:
+            status_text = f"Finished: {finished} / {MARBLE_COUNT}"
+            self._status_surf = self.font.render(status_text, True, TEXT_COLOR)
+            self._status_count = finished
+        self.screen.blit(self._status_surf, (10, 10))
 
         if self.state == "running":
             minutes = int(self.time_remaining // 60)
             seconds = int(self.time_remaining % 60)
             timer_color = (255, 100, 100) if self.time_remaining < 10 else TEXT_COLOR
             timer_text = f"Time: {minutes}:{seconds:02d}"
-            timer_surf = self.font.render(timer_text, True, timer_color)
-            self.screen.blit(timer_surf, (WIDTH - 100, 10))
-
-    def draw_results(self):
-        title = self.font.render("SIMULATION COMPLETE - RANK ORDER", True, TEXT_COLOR)
-        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 20))
+            if (timer_text, timer_color) != self._timer_key:
+                self._timer_surf = self.font.render(timer_text, True, timer_color)
+                self._timer_key = (timer_text, timer_color)
+            self.screen.blit(self._timer_surf, (WIDTH - 100, 10))
+
+    def draw_results(self, mouse_pos):
+        if self._results_surf is None:
+            self._results_surf = self._render_results()
+            self.screen.blit(self._results_surf, (0, 0))
+            dirty = None
+        else:
+            rect = self.reset_button.rect
+            self.screen.blit(self._results_surf, rect, rect)
+            dirty = [rect]
+        self.reset_button.draw(self.screen, mouse_pos)
+        if self._exposed:
+            self._exposed = False
+            dirty = None
+        return dirty
+
+    def _render_results(self):
+        surf = pygame.Surface((WIDTH, HEIGHT)).convert()
+        surf.fill(BG_COLOR)
+        title = self._title_surf
+        surf.blit(title, (WIDTH // 2 - title.get_width() // 2, 20))
 
         start_x = 30
         start_y = 60
         cols = 5
         padding_x = 155
         padding_y = 35
-        small_font = pygame.font.SysFont("Arial", 12)
+        small_font = get_font(12)
 
         for i, m in enumerate(self.finished_rank):
             row = i // cols
@@ -416,19 +621,20 @@ class MarbleSimulation:
             x = start_x + col * padding_x
             y = start_y + row * padding_y
 
-            display_radius = m['radius'] * 1.2
-            if m['shape_type'] == 0:
-                pygame.draw.circle(self.screen, m['color'], (x, y), int(display_radius))
+            display_radius = m.radius * 1.2
+            if m.shape_type == 0:
+                pygame.draw.circle(surf, m.color, (x, y), int(display_radius))
             else:
-                vertices = get_polygon_vertices(m['shape_type'], display_radius)
+                vertices = get_polygon_vertices(m.shape_type, display_radius)
                 points = [(int(x + vx), int(y + vy)) for vx, vy in vertices]
-                pygame.draw.polygon(self.screen, m['color'], points)
+                pygame.draw.polygon(surf, m.color, points)
 
-            if m.get('tied_for_last'):
-                rank_text = small_font.render(f"TIED {m['name']}", True, (255, 100, 100))
+            if m.tied_for_last:
+                rank_text = small_font.render(f"TIED {m.name}", True, (255, 100, 100))
             else:
-                rank_text = small_font.render(f"#{i+1} {m['name']}", True, (200, 200, 200))
-            self.screen.blit(rank_text, (x + 12, y - 6))
+                rank_text = small_font.render(f"#{i+1} {m.name}", True, (200, 200, 200))
+            surf.blit(rank_text, (x + 12, y - 6))
+        return surf
 
 
 async def main():